@@ -0,0 +1,137 @@
+# backend/llm_cache.py
+"""Persistent cache of Gemini responses, keyed on the prompt.
+
+Opt-in: set LLM_CACHE_ENABLED=1. Entries live in a SQLite file
+(LLM_CACHE_PATH) and expire after LLM_CACHE_TTL seconds.
+
+SEMANTIC_CACHE_ENABLED=1 adds an in-memory cache that also answers
+near-identical prompts (needs `pip install sentence-transformers`).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".gemini_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # seconds
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92  # cosine similarity
+SEMANTIC_CACHE_TTL = 900  # seconds, short so updated sites aren't answered from stale scrapes
+SEMANTIC_CACHE_SIZE = 256  # entries per namespace
+
+_URL_RE = re.compile(r"https?://([^/\s]+)[^\s]*")
+
+def make_key(model: str, system_prompt: str, prompt_parts: Any, json_response: bool) -> str:
+    """SHA-256 of everything that determines the response"""
+    payload = json.dumps(
+        {"model": model, "sys": system_prompt, "parts": prompt_parts, "json": json_response},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class LLMCache:
+    """SQLite table of (key, response, ts), shared by every thread"""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL):
+        self.ttl = ttl
+        # One connection guarded by a lock; sqlite3 objects can't be shared otherwise
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response BLOB, ts INTEGER)"
+            )
+            # Expired rows are skipped on read and dropped on the next start
+            self.db.execute("DELETE FROM responses WHERE ts <= ?", (int(time.time()) - ttl,))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None if missing or expired"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT response FROM responses WHERE key = ? AND ts > ?",
+                (key, int(time.time()) - self.ttl),
+            ).fetchone()
+        return row[0].decode() if row else None
+
+    def set(self, key: str, response: str) -> None:
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                (key, response.encode(), int(time.time())),
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+class SemanticCache:
+    """Embedding-similarity cache, one namespace per (URLs, system prompt)
+
+    Only the prompt parts are embedded: the system prompt picks the
+    namespace instead, so an SEO answer is never reused for an audit.
+    The embedding model only reads the first 256 tokens, so every URL in
+    the prompt goes into the namespace too: "A vs B" and "A vs C, D"
+    differ only past that point.
+    """
+
+    def __init__(self, model: str = SEMANTIC_CACHE_MODEL, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 ttl: int = SEMANTIC_CACHE_TTL, size: int = SEMANTIC_CACHE_SIZE):
+        import numpy as np
+        from sentence_transformers import SentenceTransformer
+
+        self.np = np
+        self.encoder = SentenceTransformer(model)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.size = size
+        self.lock = threading.Lock()
+        # namespace -> [(timestamp, normalized embedding, response text)]
+        self.entries: Dict[str, List[Tuple[float, Any, str]]] = {}
+
+    @staticmethod
+    def namespace(system_prompt: str, prompt_parts: Any, json_response: bool) -> str:
+        text = " ".join(map(str, prompt_parts))
+        matches = list(_URL_RE.finditer(text))
+        domain = matches[0].group(1).lower() if matches else ""
+        # Readable first domain, then a digest of every URL in order
+        urls = [match.group(0) for match in matches]
+        digest = hashlib.sha256(f"{json_response}:{urls}:{system_prompt}".encode()).hexdigest()[:16]
+        return f"{domain}:{digest}"
+
+    def embed(self, prompt_parts: Any):
+        return self.encoder.encode(" ".join(map(str, prompt_parts)), normalize_embeddings=True)
+
+    def get(self, namespace: str, embedding) -> Optional[str]:
+        """Return the closest live response above the threshold, if any"""
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            live = [entry for entry in self.entries.get(namespace, ()) if entry[0] > cutoff]
+            self.entries[namespace] = live
+        if not live:
+            return None
+        scores = self.np.stack([entry[1] for entry in live]) @ embedding
+        best = int(scores.argmax())
+        return live[best][2] if scores[best] >= self.threshold else None
+
+    def set(self, namespace: str, embedding, response: str) -> None:
+        with self.lock:
+            bucket = self.entries.setdefault(namespace, [])
+            bucket.append((time.time(), embedding, response))
+            del bucket[:-self.size]
+
+def create_semantic_cache() -> Optional[SemanticCache]:
+    """The shared semantic cache, or None when disabled"""
+    return SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+
+def create_cache() -> Optional[LLMCache]:
+    """The shared cache, or None when caching is disabled"""
+    return LLMCache() if LLM_CACHE_ENABLED else None
@@ -1,14 +1,24 @@
 # backend/main.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional, Dict, Any
+from fastapi.responses import ORJSONResponse, Response
+import msgspec
+from typing import List, Optional, Dict, Any, Callable
 import asyncio
+import atexit
+import hashlib
+import re
+import secrets
+import shutil
+import tempfile
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 import uvicorn
 from datetime import datetime
-import json
 import os
 from urllib.parse import urlparse
+import orjson
+from prometheus_fastapi_instrumentator import Instrumentator
 
 # Import your website analyzer functions
 from website_analyzer import (
@@ -21,13 +31,27 @@ from website_analyzer import (
     generate_email_campaigns, 
     create_brochure, 
     Website,
-    analyze_website_complete  # Added this import
+    analyze_website_complete,  # Added this import
+    analysis_failed
 )
+from storage import JobState, REDIS_URL, create_store
+
+# Single-analysis jobs for /analyze/complete, each called with the URL
+_ANALYZERS: Dict[str, Callable[[str], Any]] = {
+    "seo": analyze_seo,
+    "audit": comprehensive_audit,
+    "content": generate_content_ideas,
+    "social": generate_social_media_strategy,
+    "contact": extract_contact_info,
+    "email": generate_email_campaigns,
+    "brochure": partial(create_brochure, "Company")
+}
 
 app = FastAPI(
     title="Website Analyzer API",
     description="AI-powered website analysis and marketing intelligence platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for frontend integration
@@ -48,285 +72,421 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Pydantic models for request/response validation
-class URLRequest(BaseModel):
+# Request counters/latencies on /metrics, replacing the per-request access log.
+# With several workers, PROMETHEUS_MULTIPROC_DIR (set by __main__) makes /metrics
+# aggregate every worker instead of reporting whichever one answered.
+Instrumentator().instrument(app).expose(app, include_in_schema=False)
+
+# msgspec structs for request validation
+class URLRequest(msgspec.Struct):
     url: str  # Changed from HttpUrl to str for flexibility
     
-class CompetitorAnalysisRequest(BaseModel):
+class CompetitorAnalysisRequest(msgspec.Struct):
     main_url: str  # Changed from HttpUrl to str
     competitor_urls: List[str]  # Changed from List[HttpUrl] to List[str]
     
-class ContentRequest(BaseModel):
+class ContentRequest(msgspec.Struct):
     url: str  # Changed from HttpUrl to str
     content_type: str = "blog"
     
-class SocialMediaRequest(BaseModel):
+class SocialMediaRequest(msgspec.Struct):
     url: str  # Changed from HttpUrl to str
-    platforms: List[str] = ["LinkedIn", "Twitter", "Instagram"]
+    platforms: List[str] = msgspec.field(default_factory=lambda: ["LinkedIn", "Twitter", "Instagram"])
     
-class EmailCampaignRequest(BaseModel):
+class EmailCampaignRequest(msgspec.Struct):
     url: str  # Changed from HttpUrl to str
     campaign_type: str = "welcome_series"
     
-class BrochureRequest(BaseModel):
+class BrochureRequest(msgspec.Struct):
     url: str  # Changed from HttpUrl to str
     company_name: Optional[str] = None
     humorous: bool = False
 
-class AnalysisRequest(BaseModel):
+class AnalysisRequest(msgspec.Struct):
     url: str
     analysis_type: str = "all"
 
-class AnalysisResponse(BaseModel):
-    success: bool
-    data: Dict[Any, Any]
-    message: str
-    timestamp: datetime
+def msgspec_body(model):
+    """Dependency that decodes the JSON request body straight into a msgspec struct"""
+    decoder = msgspec.json.Decoder(model)
+
+    async def parse_body(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return parse_body
+
+def msgspec_openapi(model) -> Dict[str, Any]:
+    """openapi_extra documenting a msgspec_body() body, which FastAPI can't see itself"""
+    schema = msgspec.json.schema(model)
+    # The request structs are flat, so inline the one definition instead of a $ref
+    schema = schema["$defs"][schema["$ref"].rsplit("/", 1)[-1]]
+    return {"requestBody": {"content": {"application/json": {"schema": schema}}, "required": True}}
+
+# Thread pool for the blocking scrape/Gemini calls made by the endpoints
+ANALYSIS_WORKERS = 32
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analyzer")
+
+# Analysis cache and job state (in-memory, or Redis when REDIS_URL is set)
+store = create_store()
+# In-flight analyses, so identical concurrent requests share one run
+_pending: Dict[str, asyncio.Future] = {}
+
+# Coarse clock refreshed by a background task, so handlers don't each call datetime.now()
+CLOCK_TICK = 0.1  # seconds
+_clock_task: Optional[asyncio.Task] = None
+
+def _health_bytes(timestamp: str) -> bytes:
+    return orjson.dumps({
+        "status": "healthy", 
+        "timestamp": timestamp,
+        "service": "Website Analyzer API",
+        "version": "1.0.0"
+    })
 
-# In-memory storage for demo (use Redis/Database in production)
-analysis_cache = {}
-analysis_jobs = {}
+_now_iso = datetime.now().isoformat()
+_HEALTH_BYTES = _health_bytes(_now_iso)
+
+async def _tick():
+    global _now_iso, _HEALTH_BYTES
+    while True:
+        _now_iso = datetime.now().isoformat()
+        _HEALTH_BYTES = _health_bytes(_now_iso)
+        await asyncio.sleep(CLOCK_TICK)
 
 # Helper function to validate URL
+_SCHEME_RE = re.compile(r'^https?://', re.IGNORECASE)
+
+@lru_cache(maxsize=2048)
 def validate_url(url: str) -> str:
     """Validate and normalize URL"""
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    return url
+    return url if _SCHEME_RE.match(url) else 'https://' + url
+
+# Cache helpers
+def make_cache_key(endpoint: str, url: str, *extra) -> str:
+    """Build a cache key from the endpoint, URL and any request options"""
+    # Hash the JSON array rather than joining the parts: URLs and option
+    # values can contain any separator, e.g. ["A_B"] vs ["A", "B"]
+    digest = hashlib.blake2b(orjson.dumps([url, *extra]), digest_size=16).hexdigest()
+    return f"{endpoint}:{digest}"
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match test; it uses the weak comparison, so W/ prefixes are ignored"""
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+async def cache_analysis(cache_key: str, analysis_data: Dict[str, Any]) -> None:
+    """Cache a finished analysis, unless it failed and should be retried next time"""
+    if not analysis_failed(analysis_data["analysis"]):
+        await store.set_analysis(cache_key, analysis_data)
+
+async def run_shared(cache_key: str, func, *args) -> Any:
+    """Run func(*args) in a worker thread, joining an identical run already in flight"""
+    task = _pending.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        _pending[cache_key] = task
+        task.add_done_callback(lambda _: _pending.pop(cache_key, None))
+    # Shield so one caller going away doesn't cancel the run for the others
+    return await asyncio.shield(task)
+
+def build_envelope(data: Dict[str, Any], message: str) -> Dict[str, Any]:
+    # Plain dict: the data is server-built, so Pydantic would only add overhead
+    return {"success": True, "data": data, "message": message, "timestamp": _now_iso}
+
+def analysis_response(data: Dict[str, Any], message: str) -> ORJSONResponse:
+    """Wrap server-produced analysis data without re-validating or re-encoding it"""
+    return ORJSONResponse(build_envelope(data, message))
+
+# =================== LIFECYCLE ===================
+
+@app.on_event("startup")
+async def configure_executor():
+    """Run blocking analyzer calls on a dedicated thread pool"""
+    asyncio.get_running_loop().set_default_executor(analysis_executor)
+
+@app.on_event("startup")
+async def start_clock():
+    global _clock_task
+    _clock_task = asyncio.create_task(_tick())
+
+@app.on_event("shutdown")
+async def stop_clock():
+    if _clock_task is not None:
+        _clock_task.cancel()
+
+@app.on_event("shutdown")
+async def close_store():
+    await store.close()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    analysis_executor.shutdown(wait=False)
 
 # =================== API ENDPOINTS ===================
 
+# Static payloads, built once at import
+_ROOT_RESPONSE = {
+    "message": "Website Analyzer API",
+    "version": "1.0.0",
+    "status": "operational",
+    "endpoints": {
+        "analysis": (
+            "/analyze/seo",
+            "/analyze/competitors", 
+            "/analyze/content",
+            "/analyze/contact", 
+            "/analyze/audit",
+            "/analyze/social",
+            "/analyze/email",
+            "/analyze/brochure",
+            "/analyze/complete"
+        ),
+        "utility": (
+            "/website/info",
+            "/jobs/{job_id}",
+            "/health",
+            "/metrics"
+        )
+    }
+}
+
+_AVAILABLE_ENDPOINTS = (
+    "/", "/analyze/seo", "/analyze/competitors", "/analyze/content",
+    "/analyze/contact", "/analyze/audit", "/analyze/social", 
+    "/analyze/email", "/analyze/brochure", "/analyze/complete",
+    "/website/info", "/health", "/jobs", "/metrics"
+)
+
+_ROOT_BYTES = orjson.dumps(_ROOT_RESPONSE)
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Website Analyzer API",
-        "version": "1.0.0",
-        "status": "operational",
-        "endpoints": {
-            "analysis": [
-                "/analyze/seo",
-                "/analyze/competitors", 
-                "/analyze/content",
-                "/analyze/contact", 
-                "/analyze/audit",
-                "/analyze/social",
-                "/analyze/email",
-                "/analyze/brochure",
-                "/analyze/complete"
-            ],
-            "utility": [
-                "/website/info",
-                "/jobs/{job_id}",
-                "/health"
-            ]
-        }
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
-@app.post("/analyze/seo", response_model=AnalysisResponse)
-async def analyze_website_seo(request: URLRequest):
+@app.post("/analyze/seo", openapi_extra=msgspec_openapi(URLRequest))
+async def analyze_website_seo(request: URLRequest = Depends(msgspec_body(URLRequest))):
     """Perform SEO analysis on a website"""
     try:
         url_str = validate_url(request.url)
         
         # Check cache first
-        cache_key = f"seo_{url_str}"
-        if cache_key in analysis_cache:
-            return AnalysisResponse(
-                success=True,
-                data=analysis_cache[cache_key],
-                message="SEO analysis retrieved from cache",
-                timestamp=datetime.now()
-            )
+        cache_key = make_cache_key("seo", url_str)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "SEO analysis retrieved from cache")
         
         # Perform analysis
-        result = analyze_seo(url_str)
+        result = await run_shared(cache_key, analyze_seo, url_str)
         
         # Cache result
         analysis_data = {"analysis": result, "type": "seo", "url": url_str}
-        analysis_cache[cache_key] = analysis_data
+        await cache_analysis(cache_key, analysis_data)
         
-        return AnalysisResponse(
-            success=True,
-            data=analysis_data,
-            message="SEO analysis completed successfully",
-            timestamp=datetime.now()
-        )
+        return analysis_response(analysis_data, "SEO analysis completed successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"SEO analysis failed: {str(e)}")
 
-@app.post("/analyze/competitors", response_model=AnalysisResponse)
-async def analyze_website_competitors(request: CompetitorAnalysisRequest):
+@app.post("/analyze/competitors", openapi_extra=msgspec_openapi(CompetitorAnalysisRequest))
+async def analyze_website_competitors(request: CompetitorAnalysisRequest = Depends(msgspec_body(CompetitorAnalysisRequest))):
     """Analyze competitors"""
     try:
         main_url = validate_url(request.main_url)
         competitor_urls = [validate_url(url) for url in request.competitor_urls]
         
-        result = analyze_competitors(main_url, competitor_urls)
+        cache_key = make_cache_key("competitors", main_url, *competitor_urls)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Competitor analysis retrieved from cache")
         
-        return AnalysisResponse(
-            success=True,
-            data={
-                "analysis": result, 
-                "type": "competitors",
-                "main_url": main_url,
-                "competitor_urls": competitor_urls
-            },
-            message="Competitor analysis completed successfully",
-            timestamp=datetime.now()
-        )
+        # analyze_competitors scrapes the sites concurrently through the shared page cache
+        result = await run_shared(cache_key, analyze_competitors, main_url, competitor_urls)
+        
+        analysis_data = {
+            "analysis": result, 
+            "type": "competitors",
+            "main_url": main_url,
+            "competitor_urls": competitor_urls
+        }
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Competitor analysis completed successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Competitor analysis failed: {str(e)}")
 
-@app.post("/analyze/content", response_model=AnalysisResponse)
-async def generate_website_content(request: ContentRequest):
+@app.post("/analyze/content", openapi_extra=msgspec_openapi(ContentRequest))
+async def generate_website_content(request: ContentRequest = Depends(msgspec_body(ContentRequest))):
     """Generate content ideas"""
     try:
         url_str = validate_url(request.url)
-        result = generate_content_ideas(url_str, request.content_type)
-        
-        return AnalysisResponse(
-            success=True,
-            data={
-                "analysis": result, 
-                "type": "content", 
-                "content_type": request.content_type,
-                "url": url_str
-            },
-            message="Content ideas generated successfully",
-            timestamp=datetime.now()
-        )
+        
+        cache_key = make_cache_key("content", url_str, request.content_type)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Content ideas retrieved from cache")
+        
+        result = await run_shared(cache_key, generate_content_ideas, url_str, request.content_type)
+        
+        analysis_data = {
+            "analysis": result, 
+            "type": "content", 
+            "content_type": request.content_type,
+            "url": url_str
+        }
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Content ideas generated successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
 
-@app.post("/analyze/contact", response_model=AnalysisResponse)
-async def extract_website_contacts(request: URLRequest):
+@app.post("/analyze/contact", openapi_extra=msgspec_openapi(URLRequest))
+async def extract_website_contacts(request: URLRequest = Depends(msgspec_body(URLRequest))):
     """Extract contact information"""
     try:
         url_str = validate_url(request.url)
-        result = extract_contact_info(url_str)
         
-        return AnalysisResponse(
-            success=True,
-            data={"analysis": result, "type": "contact", "url": url_str},
-            message="Contact information extracted successfully",
-            timestamp=datetime.now()
-        )
+        cache_key = make_cache_key("contact", url_str)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Contact information retrieved from cache")
+        
+        result = await run_shared(cache_key, extract_contact_info, url_str)
+        
+        analysis_data = {"analysis": result, "type": "contact", "url": url_str}
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Contact information extracted successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Contact extraction failed: {str(e)}")
 
-@app.post("/analyze/audit", response_model=AnalysisResponse)
-async def audit_website(request: URLRequest):
+@app.post("/analyze/audit", openapi_extra=msgspec_openapi(URLRequest))
+async def audit_website(request: URLRequest = Depends(msgspec_body(URLRequest))):
     """Comprehensive website audit"""
     try:
         url_str = validate_url(request.url)
-        result = comprehensive_audit(url_str)
         
-        return AnalysisResponse(
-            success=True,
-            data={"analysis": result, "type": "audit", "url": url_str},
-            message="Website audit completed successfully",
-            timestamp=datetime.now()
-        )
+        cache_key = make_cache_key("audit", url_str)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Website audit retrieved from cache")
+        
+        result = await run_shared(cache_key, comprehensive_audit, url_str)
+        
+        analysis_data = {"analysis": result, "type": "audit", "url": url_str}
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Website audit completed successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Website audit failed: {str(e)}")
 
-@app.post("/analyze/social", response_model=AnalysisResponse)
-async def generate_social_strategy(request: SocialMediaRequest):
+@app.post("/analyze/social", openapi_extra=msgspec_openapi(SocialMediaRequest))
+async def generate_social_strategy(request: SocialMediaRequest = Depends(msgspec_body(SocialMediaRequest))):
     """Generate social media strategy"""
     try:
         url_str = validate_url(request.url)
-        result = generate_social_media_strategy(url_str, request.platforms)
-        
-        return AnalysisResponse(
-            success=True,
-            data={
-                "analysis": result, 
-                "type": "social", 
-                "platforms": request.platforms,
-                "url": url_str
-            },
-            message="Social media strategy generated successfully",
-            timestamp=datetime.now()
-        )
+        
+        cache_key = make_cache_key("social", url_str, *request.platforms)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Social media strategy retrieved from cache")
+        
+        result = await run_shared(cache_key, generate_social_media_strategy, url_str, request.platforms)
+        
+        analysis_data = {
+            "analysis": result, 
+            "type": "social", 
+            "platforms": request.platforms,
+            "url": url_str
+        }
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Social media strategy generated successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Social media strategy failed: {str(e)}")
 
-@app.post("/analyze/email", response_model=AnalysisResponse)
-async def generate_email_strategy(request: EmailCampaignRequest):
+@app.post("/analyze/email", openapi_extra=msgspec_openapi(EmailCampaignRequest))
+async def generate_email_strategy(request: EmailCampaignRequest = Depends(msgspec_body(EmailCampaignRequest))):
     """Generate email campaign"""
     try:
         url_str = validate_url(request.url)
-        result = generate_email_campaigns(url_str, request.campaign_type)
-        
-        return AnalysisResponse(
-            success=True,
-            data={
-                "analysis": result, 
-                "type": "email", 
-                "campaign_type": request.campaign_type,
-                "url": url_str
-            },
-            message="Email campaign generated successfully",
-            timestamp=datetime.now()
-        )
+        
+        cache_key = make_cache_key("email", url_str, request.campaign_type)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Email campaign retrieved from cache")
+        
+        result = await run_shared(cache_key, generate_email_campaigns, url_str, request.campaign_type)
+        
+        analysis_data = {
+            "analysis": result, 
+            "type": "email", 
+            "campaign_type": request.campaign_type,
+            "url": url_str
+        }
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Email campaign generated successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Email campaign generation failed: {str(e)}")
 
-@app.post("/analyze/brochure", response_model=AnalysisResponse)
-async def create_website_brochure(request: BrochureRequest):
+@app.post("/analyze/brochure", openapi_extra=msgspec_openapi(BrochureRequest))
+async def create_website_brochure(request: BrochureRequest = Depends(msgspec_body(BrochureRequest))):
     """Create company brochure"""
     try:
         url_str = validate_url(request.url)
         
         if request.company_name:
-            result = create_brochure(request.company_name, url_str, request.humorous)
+            company_name = request.company_name
         else:
             # Auto-extract company name from URL
             domain = urlparse(url_str).netloc
             company_name = domain.replace('www.', '').split('.')[0].title()
-            result = create_brochure(company_name, url_str, request.humorous)
-        
-        return AnalysisResponse(
-            success=True,
-            data={
-                "analysis": result, 
-                "type": "brochure", 
-                "humorous": request.humorous,
-                "url": url_str
-            },
-            message="Company brochure created successfully",
-            timestamp=datetime.now()
-        )
+        
+        cache_key = make_cache_key("brochure", url_str, company_name, request.humorous)
+        cached = await store.get_analysis(cache_key)
+        if cached is not None:
+            return analysis_response(cached, "Company brochure retrieved from cache")
+        
+        result = await run_shared(cache_key, create_brochure, company_name, url_str, request.humorous)
+        
+        analysis_data = {
+            "analysis": result, 
+            "type": "brochure", 
+            "humorous": request.humorous,
+            "url": url_str
+        }
+        await cache_analysis(cache_key, analysis_data)
+        
+        return analysis_response(analysis_data, "Company brochure created successfully")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Brochure creation failed: {str(e)}")
 
-@app.post("/analyze/complete")
+@app.post("/analyze/complete", openapi_extra=msgspec_openapi(AnalysisRequest))
 async def complete_website_analysis(
-    request: AnalysisRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    request: AnalysisRequest = Depends(msgspec_body(AnalysisRequest))
 ):
     """Run complete analysis (async background job)"""
     try:
         url_str = validate_url(request.url)
-        job_id = f"job_{int(datetime.now().timestamp() * 1000)}"  # More unique job ID
+        job_id = "job_" + secrets.token_urlsafe(9)  # Random, so concurrent submits can't collide
         
         # Initialize job status
-        analysis_jobs[job_id] = {
-            "status": "running",
-            "progress": 0,
-            "results": {},
-            "started_at": datetime.now().isoformat(),
-            "url": url_str,
-            "analysis_type": request.analysis_type
-        }
+        await store.create_job(job_id, JobState(
+            url=url_str,
+            analysis_type=request.analysis_type,
+            started_at=_now_iso
+        ))
         
         # Run analysis in background
         background_tasks.add_task(run_complete_analysis, job_id, url_str, request.analysis_type)
@@ -344,57 +504,45 @@ async def complete_website_analysis(
         raise HTTPException(status_code=500, detail=f"Failed to start analysis: {str(e)}")
 
 @app.get("/jobs/{job_id}")
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, request: Request):
     """Get analysis job status"""
-    if job_id not in analysis_jobs:
+    job = await store.get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = analysis_jobs[job_id]
-    
-    # Convert datetime objects to strings for JSON serialization
-    if isinstance(job.get("started_at"), datetime):
-        job["started_at"] = job["started_at"].isoformat()
-    if isinstance(job.get("completed_at"), datetime):
-        job["completed_at"] = job["completed_at"].isoformat()
+    # Pollers revalidate every time and get an empty 304 until the job changes
+    headers = {"ETag": job.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, job.etag):
+        return Response(status_code=304, headers=headers)
     
-    return job
+    # Results were encoded once when the job finished; send them verbatim
+    return Response(content=job.to_json(), media_type="application/json", headers=headers)
 
 async def run_complete_analysis(job_id: str, url: str, analysis_type: str = "all"):
     """Background task for complete analysis"""
     try:
-        job = analysis_jobs[job_id]
-        
         if analysis_type == "all":
             # Use the analyze_website_complete function from website_analyzer.py
-            results = analyze_website_complete(url, "all")
-            job["results"] = results
-            job["progress"] = 100
+            results = await asyncio.to_thread(analyze_website_complete, url, "all")
         else:
             # Run specific analysis
-            analysis_functions = {
-                "seo": lambda: analyze_seo(url),
-                "audit": lambda: comprehensive_audit(url),
-                "content": lambda: generate_content_ideas(url),
-                "social": lambda: generate_social_media_strategy(url),
-                "contact": lambda: extract_contact_info(url),
-                "email": lambda: generate_email_campaigns(url),
-                "brochure": lambda: create_brochure("Company", url)
-            }
-            
-            if analysis_type in analysis_functions:
-                result = analysis_functions[analysis_type]()
-                job["results"][analysis_type] = result
-                job["progress"] = 100
-            else:
+            func = _ANALYZERS.get(analysis_type)
+            if func is None:
                 raise ValueError(f"Invalid analysis type: {analysis_type}")
+            result = await asyncio.to_thread(func, url)
+            results = {analysis_type: result}
         
-        job["status"] = "completed"
-        job["completed_at"] = datetime.now().isoformat()
+        await store.update_job(
+            job_id,
+            results=orjson.dumps(results),
+            progress=100,
+            status="completed",
+            completed_at=_now_iso
+        )
         
     except Exception as e:
-        analysis_jobs[job_id]["status"] = "failed"
-        analysis_jobs[job_id]["error"] = str(e)
-        analysis_jobs[job_id]["completed_at"] = datetime.now().isoformat()
+        await store.update_job(job_id, status="failed", error=str(e), completed_at=_now_iso)
 
 # =================== UTILITY ENDPOINTS ===================
 
@@ -403,7 +551,7 @@ async def get_website_info(url: str):
     """Get basic website information"""
     try:
         url = validate_url(url)
-        website = Website(url)
+        website = await asyncio.to_thread(Website, url)
         return {
             "success": True,
             "data": {
@@ -413,7 +561,7 @@ async def get_website_info(url: str):
                 "domain": website.domain,
                 "links_count": len(website.links),
                 "images_count": len(website.images),
-                "content_length": len(website.text),
+                "content_length": website.text_length,
                 "status_code": website.status_code
             },
             "url": url
@@ -423,37 +571,35 @@ async def get_website_info(url: str):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy", 
-        "timestamp": datetime.now().isoformat(),
-        "service": "Website Analyzer API",
-        "version": "1.0.0"
-    }
+    """Health check endpoint (body re-encoded by the clock tick, not per probe)"""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.get("/jobs")
 async def list_jobs():
     """List all analysis jobs"""
+    job_ids = await store.job_ids()
     return {
-        "total_jobs": len(analysis_jobs),
-        "jobs": list(analysis_jobs.keys()),
-        "cache_size": len(analysis_cache)
+        "total_jobs": len(job_ids),
+        "jobs": job_ids,
+        "cache_size": await store.cache_size()
     }
 
 # =================== ERROR HANDLERS ===================
 
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return {"error": "Endpoint not found", "available_endpoints": [
-        "/", "/analyze/seo", "/analyze/competitors", "/analyze/content",
-        "/analyze/contact", "/analyze/audit", "/analyze/social", 
-        "/analyze/email", "/analyze/brochure", "/analyze/complete",
-        "/website/info", "/health", "/jobs"
-    ]}
+    return ORJSONResponse(
+        status_code=404,
+        content={
+            "error": "Endpoint not found",
+            "detail": getattr(exc, "detail", None),
+            "available_endpoints": _AVAILABLE_ENDPOINTS
+        }
+    )
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return {"error": "Internal server error", "message": str(exc)}
+    return ORJSONResponse(status_code=500, content={"error": "Internal server error", "message": str(exc)})
 
 # =================== RUN SERVER ===================
 if __name__ == "__main__":
@@ -470,12 +616,26 @@ if __name__ == "__main__":
     print("   - Complete Analysis: POST /analyze/complete")
     print("   - Website Info: GET /website/info")
     print("   - Health Check: GET /health")
+    print("   - Metrics: GET /metrics")
     print("=" * 50)
     
+    # Jobs live in process memory unless Redis is configured, so only scale out with Redis
+    workers = os.cpu_count() if REDIS_URL else 1
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # Each worker has its own metrics registry; in multiprocess mode they
+        # write to files in this (fresh, so empty) directory and /metrics sums them
+        metrics_dir = tempfile.mkdtemp(prefix="analyzer-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+        # Workers only import main, so just the supervisor removes it, on exit
+        atexit.register(shutil.rmtree, metrics_dir, ignore_errors=True)
+    
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        workers=workers,
+        loop="auto",  # uvloop when installed (not available on Windows)
+        http="auto",  # httptools when installed
+        log_level="warning",
+        access_log=False
     )
\ No newline at end of file
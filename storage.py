@@ -0,0 +1,141 @@
+# backend/storage.py
+"""Analysis cache and job storage.
+
+In-memory by default. Set REDIS_URL to share the cache and job state
+between several uvicorn workers.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+import orjson
+
+REDIS_URL = os.getenv("REDIS_URL")
+ANALYSIS_CACHE_SIZE = 512
+ANALYSIS_CACHE_TTL = 3600  # seconds
+JOB_TTL = 24 * 3600  # seconds, Redis only
+
+@dataclass(slots=True)
+class JobState:
+    """Status of a background analysis job (timestamps are ISO strings)"""
+    url: str
+    analysis_type: str
+    started_at: str
+    status: str = "running"
+    progress: int = 0
+    results: bytes = b"{}"  # orjson-encoded once, when the job finishes
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+    etag: str = ""  # refreshed by the store on every change
+
+    def to_json(self) -> bytes:
+        """Encode the public fields, splicing in the pre-encoded results"""
+        head = orjson.dumps({
+            f.name: getattr(self, f.name) for f in fields(self) if f.name not in ("results", "etag")
+        })
+        return head[:-1] + b',"results":' + self.results + b"}"
+
+def compute_etag(job: JobState) -> str:
+    digest = hashlib.blake2b(job.to_json(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+def _encode_field(name: str, value: Any) -> bytes:
+    # results is already JSON; everything else is encoded per field
+    return value if name == "results" else orjson.dumps(value)
+
+def _decode_field(name: str, raw: bytes) -> Any:
+    return raw if name == "results" else orjson.loads(raw)
+
+class MemoryStore:
+    """Process-local storage, only valid with a single worker"""
+
+    def __init__(self, cache_size: int = ANALYSIS_CACHE_SIZE, cache_ttl: int = ANALYSIS_CACHE_TTL):
+        # Only touched from the event loop thread, so no lock is needed
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.jobs: Dict[str, JobState] = {}
+
+    async def get_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis, or None if missing or expired"""
+        try:
+            return self.cache[key]
+        except KeyError:
+            return None
+
+    async def set_analysis(self, key: str, data: Dict[str, Any]) -> None:
+        self.cache[key] = data
+
+    async def cache_size(self) -> int:
+        return self.cache.currsize
+
+    async def create_job(self, job_id: str, job: JobState) -> None:
+        job.etag = compute_etag(job)
+        self.jobs[job_id] = job
+
+    async def update_job(self, job_id: str, **changes) -> None:
+        job = self.jobs[job_id]
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.etag = compute_etag(job)
+
+    async def get_job(self, job_id: str) -> Optional[JobState]:
+        return self.jobs.get(job_id)
+
+    async def job_ids(self) -> List[str]:
+        return list(self.jobs)
+
+    async def close(self) -> None:
+        pass
+
+class RedisStore:
+    """Redis-backed storage shared by every worker process"""
+
+    def __init__(self, url: str, cache_ttl: int = ANALYSIS_CACHE_TTL, job_ttl: int = JOB_TTL):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.cache_ttl = cache_ttl
+        self.job_ttl = job_ttl
+
+    async def get_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"analysis:{key}")
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set_analysis(self, key: str, data: Dict[str, Any]) -> None:
+        await self.redis.setex(f"analysis:{key}", self.cache_ttl, orjson.dumps(data))
+
+    async def cache_size(self) -> int:
+        return len([key async for key in self.redis.scan_iter(match="analysis:*")])
+
+    async def create_job(self, job_id: str, job: JobState) -> None:
+        key = f"job:{job_id}"
+        job.etag = compute_etag(job)
+        mapping = {f.name: _encode_field(f.name, getattr(job, f.name)) for f in fields(job)}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            await pipe.hset(key, mapping=mapping).expire(key, self.job_ttl).execute()
+
+    async def update_job(self, job_id: str, **changes) -> None:
+        # Each field is stored JSON-encoded, e.g. HSET job:<id> progress 100
+        mapping = {name: _encode_field(name, value) for name, value in changes.items()}
+        await self.redis.hset(f"job:{job_id}", mapping=mapping)
+        job = await self.get_job(job_id)
+        await self.redis.hset(f"job:{job_id}", "etag", orjson.dumps(compute_etag(job)))
+
+    async def get_job(self, job_id: str) -> Optional[JobState]:
+        raw = await self.redis.hgetall(f"job:{job_id}")
+        if not raw:
+            return None
+        return JobState(**{
+            name.decode(): _decode_field(name.decode(), value) for name, value in raw.items()
+        })
+
+    async def job_ids(self) -> List[str]:
+        return [key.decode()[len("job:"):] async for key in self.redis.scan_iter(match="job:*")]
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+def create_store():
+    """Pick the backend from the environment"""
+    return RedisStore(REDIS_URL) if REDIS_URL else MemoryStore()
@@ -4,16 +4,36 @@ import os
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from typing import List, Dict, Any
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 import google.generativeai as genai
+
+# selectolax parses in C (lexbor backend first, then Modest); fall back to
+# BeautifulSoup's pure-Python parser if it's missing
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+        from bs4 import BeautifulSoup
 import re
+import codecs
 from urllib.parse import urljoin, urlparse
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 import logging
+from collections import namedtuple
+from cachetools import TTLCache
+
+from llm_cache import create_cache as create_llm_cache, create_semantic_cache, make_key as make_llm_cache_key
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +49,135 @@ if api_key and len(api_key) > 10:
 else:
     print("There might be a problem with your API key!")
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# One pooled session for every scrape, so repeated requests to the same host
+# reuse the TCP/TLS connection instead of handshaking again
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    # 429 and Retry-After are left to Website: sleeping here would stall the
+    # worker, while recording them lets every worker skip the host instead
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=False,
+    ),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# Hosts that answered 429, mapped to the time.monotonic() until which they're skipped
+RATE_LIMIT_DEFAULT_WAIT = 30  # seconds, when Retry-After is missing or unparseable
+RATE_LIMIT_MAX_WAIT = 300  # seconds
+_rate_limited_until: Dict[str, float] = {}
+_rate_limit_lock = threading.Lock()
+
+def _retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    try:
+        wait = Retry().parse_retry_after(value) if value else RATE_LIMIT_DEFAULT_WAIT
+    except Exception:
+        wait = RATE_LIMIT_DEFAULT_WAIT
+    return min(max(wait, 0), RATE_LIMIT_MAX_WAIT)
+
+# Links and images found on a page, as compact records instead of dicts
+Link = namedtuple('Link', 'url text title')
+Image = namedtuple('Image', 'url alt title')
+
+# In-page anchors and non-navigable links aren't worth listing
+SKIPPED_LINK_PREFIXES = ('#', 'mailto:', 'javascript:', 'data:')
+SKIPPED_IMAGE_PREFIXES = ('data:', 'javascript:')
+
+# Bytes of HTML read per page; anything past this is never parsed
+MAX_BODY_BYTES = 1 << 20
+
+# Characters of page text kept per Website (the prompts use at most 4000)
+MAX_TEXT_CHARS = 8192
+
+# Elements dropped before extracting the page text
+TEXT_EXCLUDED_TAGS = ["script", "style", "img", "input", "nav", "footer", "header"]
+
+# Both description tags in one selector query; see _pick_description()
+META_DESCRIPTION_SELECTOR = 'meta[name="description"], meta[property="og:description"]'
+
+def _pick_description(metas, get_name):
+    """Prefer <meta name="description"> over og:description, whatever the page order"""
+    for meta in metas:
+        if get_name(meta) == 'description':
+            return meta
+    return metas[0] if metas else None
+
+# Charset declarations: the Content-Type header, or a <meta> near the top
+_HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)')
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+def _decode_html(body, content_type):
+    """Decode the page by its declared charset, as browsers would
+
+    Parsers given raw bytes assume UTF-8, so a windows-1252 page would come
+    out garbled or empty. Undeclared pages are tried as UTF-8 first; a
+    character cut in half by MAX_BODY_BYTES is replaced, not fatal.
+    """
+    if body.startswith(codecs.BOM_UTF8):
+        return body[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace')
+    if body.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return body.decode('utf-16', errors='replace')
+
+    match = _HEADER_CHARSET_RE.search(content_type) or _META_CHARSET_RE.search(body[:4096])
+    if match:
+        charset = match.group(1)
+        charset = charset.decode('ascii') if isinstance(charset, bytes) else charset
+        try:
+            name = codecs.lookup(charset).name
+        except LookupError:
+            name = 'utf-8'
+        # Browsers read "latin-1" pages as windows-1252, and so do we
+        if name in ('latin-1', 'iso8859-1', 'ascii'):
+            name = 'cp1252'
+        return body.decode(name, errors='replace')
+
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start >= len(body) - 3:
+            return body.decode('utf-8', errors='replace')
+        return body.decode('cp1252', errors='replace')
+
+def _bare_host(url):
+    """Lowercased host of url, without port or a leading www."""
+    host = urlparse(url).hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+def _is_same_site(url, site_host):
+    """True for links to site_host and its subdomains
+
+    Matching on a dot boundary rather than a substring keeps
+    example.com.evil.com external to example.com.
+    """
+    host = _bare_host(url)
+    return host == site_host or host.endswith('.' + site_host)
+
+def _unique_links(links):
+    """Keep the first link to each URL; nav and footer repeat the same targets"""
+    seen = set()
+    unique = []
+    for link in links:
+        if link.url not in seen:
+            seen.add(link.url)
+            unique.append(link)
+    return unique
+
 class Website:
     """Enhanced Website utility class with better error handling"""
 
@@ -40,92 +189,74 @@ class Website:
         self.meta_description = ""
         self.keywords = ""
         self.text = ""
+        self.text_length = 0  # before the MAX_TEXT_CHARS cap
+        self.text_short = self.text_med = self.text_long = ""
+        self.internal_link_count = 0
+        self.external_link_count = 0
         self.links = []
         self.images = []
         self.status_code = None
         self.error = None
-        self.body = None
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
+        with _rate_limit_lock:
+            wait = _rate_limited_until.get(self.domain, 0) - time.monotonic()
+        if wait > 0:
+            self.error = f"Skipped {url}: {self.domain} is rate limiting requests, retry in {wait:.0f}s"
+            logger.warning(self.error)
+            self.title = f"Error accessing {self.domain}"
+            return
 
         try:
             logger.info(f"Scraping {url}...")
-            response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-            response.raise_for_status()
-
-            self.body = response.content
-            self.status_code = response.status_code
-
-            soup = BeautifulSoup(self.body, 'html.parser')
-
-            # Extract title
-            if soup.title:
-                self.title = soup.title.string.strip() if soup.title.string else "No title found"
-            else:
-                # Try to find title in h1 tags
-                h1 = soup.find('h1')
-                if h1:
-                    self.title = h1.get_text(strip=True)
-                else:
+            with _SESSION.get(url, timeout=15, stream=True, allow_redirects=True) as response:
+                if response.status_code == 429:
+                    wait = _retry_after_seconds(response.headers.get('Retry-After'))
+                    with _rate_limit_lock:
+                        _rate_limited_until[self.domain] = time.monotonic() + wait
+                response.raise_for_status()
+                self.status_code = response.status_code
+
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type and 'html' not in content_type and 'xml' not in content_type:
+                    self.error = f"Non-HTML content from {url}: {content_type}"
+                    logger.warning(self.error)
                     self.title = f"Website: {self.domain}"
-
-            # Extract meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if not meta_desc:
-                meta_desc = soup.find('meta', attrs={'property': 'og:description'})
-            self.meta_description = meta_desc.get('content', '') if meta_desc else ''
-
-            # Extract keywords
-            meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-            self.keywords = meta_keywords.get('content', '') if meta_keywords else ''
-
-            # Extract text content
-            if soup.body:
-                # Remove irrelevant elements
-                for irrelevant in soup.body(["script", "style", "img", "input", "nav", "footer", "header"]):
-                    irrelevant.decompose()
-                self.text = soup.body.get_text(separator="\n", strip=True)
+                    return
+
+                # Only the start of the page is ever used, so stop reading past the cap
+                body = bytearray()
+                for chunk in response.iter_content(65536):
+                    body.extend(chunk)
+                    if len(body) >= MAX_BODY_BYTES:
+                        del body[MAX_BODY_BYTES:]
+                        break
+                body = bytes(body)
+
+            if not body.strip():
+                self.error = f"Empty response from {url}"
+                logger.warning(self.error)
+                self.title = f"Website: {self.domain}"
+                return
+
+            # The raw HTML is only needed while parsing, so it isn't kept on
+            # the instance (cached Websites would otherwise each hold up to 1 MiB)
+            html = _decode_html(body, content_type)
+            if HTMLParser is not None:
+                self._parse_selectolax(url, html)
             else:
-                self.text = soup.get_text(separator="\n", strip=True)
-
-            # Extract all links with proper URL resolution
-            links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                if href and not href.startswith('#'):  # Skip anchor links
-                    try:
-                        absolute_url = urljoin(url, href)
-                        links.append({
-                            'url': absolute_url,
-                            'text': link.get_text(strip=True),
-                            'title': link.get('title', '')
-                        })
-                    except Exception as e:
-                        logger.warning(f"Error processing link {href}: {e}")
-            self.links = links
-
-            # Extract images
-            images = []
-            for img in soup.find_all('img', src=True):
-                src = img.get('src')
-                if src:
-                    try:
-                        absolute_url = urljoin(url, src)
-                        images.append({
-                            'url': absolute_url,
-                            'alt': img.get('alt', ''),
-                            'title': img.get('title', '')
-                        })
-                    except Exception as e:
-                        logger.warning(f"Error processing image {src}: {e}")
-            self.images = images
+                self._parse_bs4(url, html)
+
+            # Prompts never use more than a few thousand characters, so keep
+            # only that much, with the prefixes they need computed once
+            self.text_length = len(self.text)
+            self.text = self.text[:MAX_TEXT_CHARS]
+            self.text_short = self.text[:2000]
+            self.text_med = self.text[:3000]
+            self.text_long = self.text[:4000]
+
+            site_host = _bare_host(url)
+            self.internal_link_count = sum(_is_same_site(link.url, site_host) for link in self.links)
+            self.external_link_count = len(self.links) - self.internal_link_count
 
             logger.info(f"Successfully scraped {url}")
 
@@ -141,6 +272,97 @@ class Website:
             self.error = error_msg
             self.title = f"Error processing {self.domain}"
 
+    def _parse_selectolax(self, url, html):
+        """Extract title, meta tags, links, images and text with selectolax"""
+        tree = HTMLParser(html)
+
+        # Extract title
+        title = tree.css_first('title')
+        if title:
+            self.title = title.text(strip=True) or "No title found"
+        else:
+            # Try to find title in h1 tags
+            h1 = tree.css_first('h1')
+            if h1:
+                self.title = h1.text(strip=True)
+            else:
+                self.title = f"Website: {self.domain}"
+
+        # Extract meta description
+        meta_desc = _pick_description(tree.css(META_DESCRIPTION_SELECTOR), lambda meta: meta.attributes.get('name'))
+        self.meta_description = (meta_desc.attributes.get('content') or '') if meta_desc else ''
+
+        # Extract keywords
+        meta_keywords = tree.css_first('meta[name="keywords"]')
+        self.keywords = (meta_keywords.attributes.get('content') or '') if meta_keywords else ''
+
+        # Extract all links with proper URL resolution
+        self.links = _unique_links(
+            Link(urljoin(url, href), link.text(strip=True), attrs.get('title') or '')
+            for link in tree.css('a[href]')
+            if (href := (attrs := link.attributes).get('href'))
+            and not href.startswith(SKIPPED_LINK_PREFIXES)
+        )
+
+        # Extract images
+        self.images = [
+            Image(urljoin(url, src), attrs.get('alt') or '', attrs.get('title') or '')
+            for img in tree.css('img[src]')
+            if (src := (attrs := img.attributes).get('src'))
+            and not src.startswith(SKIPPED_IMAGE_PREFIXES)
+        ]
+
+        # Extract text content, removing irrelevant elements in one pass
+        tree.strip_tags(TEXT_EXCLUDED_TAGS)
+        root = tree.body or tree.root
+        if root:
+            # text() keeps empty nodes, so drop the blank lines it leaves behind
+            self.text = "\n".join(filter(None, root.text(separator="\n", strip=True).split("\n")))
+
+    def _parse_bs4(self, url, html):
+        """Fallback parser used when selectolax is not installed"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Extract title
+        if soup.title:
+            self.title = soup.title.string.strip() if soup.title.string else "No title found"
+        else:
+            # Try to find title in h1 tags
+            h1 = soup.find('h1')
+            if h1:
+                self.title = h1.get_text(strip=True)
+            else:
+                self.title = f"Website: {self.domain}"
+
+        # Extract meta description
+        meta_desc = _pick_description(soup.select(META_DESCRIPTION_SELECTOR), lambda meta: meta.get('name'))
+        self.meta_description = meta_desc.get('content', '') if meta_desc else ''
+
+        # Extract keywords
+        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+        self.keywords = meta_keywords.get('content', '') if meta_keywords else ''
+
+        # Extract all links with proper URL resolution
+        self.links = _unique_links(
+            Link(urljoin(url, href), link.get_text(strip=True), link.get('title', ''))
+            for link in soup.find_all('a', href=True)
+            if (href := link['href']) and not href.startswith(SKIPPED_LINK_PREFIXES)
+        )
+
+        # Extract images
+        self.images = [
+            Image(urljoin(url, src), img.get('alt', ''), img.get('title', ''))
+            for img in soup.find_all('img', src=True)
+            if (src := img['src']) and not src.startswith(SKIPPED_IMAGE_PREFIXES)
+        ]
+
+        # Extract text content last: stripping the irrelevant elements
+        # (img included) in place would otherwise hide them from the lists above
+        root = soup.body or soup
+        for irrelevant in root(TEXT_EXCLUDED_TAGS):
+            irrelevant.decompose()
+        self.text = root.get_text(separator="\n", strip=True)
+
     def get_contents(self):
         """Get formatted content for analysis"""
         content = f"Webpage Title: {self.title}\n\n"
@@ -153,7 +375,7 @@ class Website:
             content += f"Note: Limited information available due to scraping restrictions.\n"
             content += f"Company appears to be: {self.domain}\n\n"
         else:
-            content += f"Webpage Contents:\n{self.text[:3000]}...\n\n"
+            content += f"Webpage Contents:\n{self.text_med}...\n\n"
 
         return content
 
@@ -161,7 +383,56 @@ class Website:
         """Check if the website was successfully scraped"""
         return self.error is None and self.text and len(self.text) > 100
 
+# Scraped pages, shared by the analyses of one URL (and briefly across runs)
+WEBSITE_CACHE_SIZE = 128
+WEBSITE_CACHE_TTL = 600  # seconds
+_website_cache = TTLCache(maxsize=WEBSITE_CACHE_SIZE, ttl=WEBSITE_CACHE_TTL)
+_website_cache_lock = threading.Lock()
+_website_fetch_locks: Dict[str, threading.Lock] = {}
+
+def _get_website(url):
+    """Return a recently scraped Website for url, fetching it at most once at a time"""
+    with _website_cache_lock:
+        website = _website_cache.get(url)
+        if website is not None:
+            return website
+        fetch_lock = _website_fetch_locks.setdefault(url, threading.Lock())
+
+    # Concurrent analyses of the same URL wait here for the first fetch
+    with fetch_lock:
+        with _website_cache_lock:
+            website = _website_cache.get(url)
+        if website is None:
+            website = Website(url)
+            with _website_cache_lock:
+                # Failed scrapes aren't cached so the next call can retry
+                if website.error is None:
+                    _website_cache[url] = website
+                _website_fetch_locks.pop(url, None)
+    return website
+
 # =================== HELPER FUNCTIONS ===================
+# Caps concurrent Gemini requests across every thread in the process
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '4'))
+_gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+# Built once instead of per call; the API client behind it is the SDK's
+# process-wide default either way
+_gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+# Model turn acknowledging the system prompt (this SDK has no system_instruction)
+_SYSTEM_PROMPT_ACK = {"role": "model", "parts": ["I understand. I'll help you with this analysis."]}
+
+# Opt-in persistent response cache (LLM_CACHE_ENABLED=1)
+_llm_cache = create_llm_cache()
+# Opt-in near-duplicate prompt cache (SEMANTIC_CACHE_ENABLED=1)
+_semantic_cache = create_semantic_cache()
+
+# Thread pool size for analyze_website_complete(url, "all")
+COMPLETE_ANALYSIS_WORKERS = 4
+# Most sites scraped at once by analyze_competitors()
+COMPETITOR_FETCH_WORKERS = 10
+
 def safe_ai_call(prompt_parts, system_prompt="", json_response=False):
     """Safe wrapper for Gemini API calls with error handling"""
     try:
@@ -172,35 +443,60 @@ def safe_ai_call(prompt_parts, system_prompt="", json_response=False):
         if system_prompt:
             messages = [
                 {"role": "user", "parts": [system_prompt]},
-                {"role": "model", "parts": ["I understand. I'll help you with this analysis."]},
+                _SYSTEM_PROMPT_ACK,
                 {"role": "user", "parts": prompt_parts}
             ]
         else:
             messages = [{"role": "user", "parts": prompt_parts}]
 
-        response = genai.GenerativeModel('gemini-1.5-flash').generate_content(
-            contents=messages,
-            generation_config=generation_config
-        )
-
-        if json_response:
-            return json.loads(response.text)
-        else:
-            return response.text
+        cache_key = None
+        response_text = None
+        if _llm_cache is not None:
+            cache_key = make_llm_cache_key(GEMINI_MODEL, system_prompt, prompt_parts, json_response)
+            response_text = _llm_cache.get(cache_key)
+
+        namespace = embedding = None
+        if response_text is None and _semantic_cache is not None:
+            namespace = _semantic_cache.namespace(system_prompt, prompt_parts, json_response)
+            embedding = _semantic_cache.embed(prompt_parts)
+            response_text = _semantic_cache.get(namespace, embedding)
+
+        cached = response_text is not None
+        if not cached:
+            with _gemini_slots:
+                response = _gemini_model.generate_content(
+                    contents=messages,
+                    generation_config=generation_config
+                )
+            response_text = response.text
+
+        result = json.loads(response_text) if json_response else response_text
+
+        # Only responses that parsed get cached
+        if not cached:
+            if cache_key is not None:
+                _llm_cache.set(cache_key, response_text)
+            if embedding is not None:
+                _semantic_cache.set(namespace, embedding, response_text)
+        return result
 
     except json.JSONDecodeError as e:
         logger.error(f"JSON parsing error: {e}")
-        return {"error": "Failed to parse AI response as JSON", "raw_response": response.text}
+        return {"error": "Failed to parse AI response as JSON", "raw_response": response_text}
     except Exception as e:
         logger.error(f"AI API error: {e}")
-        return f"Error: Unable to complete analysis - {str(e)}"
+        return f"{ANALYSIS_ERROR_PREFIX}Unable to complete analysis - {str(e)}"
+
+# Markers of a failed analysis, see analysis_failed()
+ANALYSIS_ERROR_PREFIX = "Error: "
+FALLBACK_ANALYSIS_STATUS = "⚠️ **Limited Analysis Available**"
 
 def create_fallback_analysis(url, domain):
     """Create basic analysis when website scraping fails"""
     return f"""# Website Analysis for {domain}
 
 ## Status
-⚠️ **Limited Analysis Available**
+{FALLBACK_ANALYSIS_STATUS}
 
 The website {url} could not be fully accessed due to access restrictions (likely bot protection or rate limiting).
 
@@ -238,11 +534,16 @@ The website {url} could not be fully accessed due to access restrictions (likely
 *Note: This analysis is limited due to access restrictions. For a complete analysis, please ensure the website is accessible to automated tools.*
 """
 
-# =================== COMPETITOR ANALYSIS ===================
-def analyze_competitors(main_url, competitor_urls: List[str]):
-    """Compare main website with competitors"""
+def analysis_failed(result):
+    """True for results that shouldn't be cached: AI errors, error dicts and scrape fallbacks"""
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, str):
+        return result.startswith(ANALYSIS_ERROR_PREFIX) or FALLBACK_ANALYSIS_STATUS in result
+    return False
 
-    system_prompt = """You are a business analyst specializing in competitive analysis.
+# =================== COMPETITOR ANALYSIS ===================
+COMPETITOR_SYSTEM_PROMPT = """You are a business analyst specializing in competitive analysis.
     Compare the main company website with competitor websites and provide insights on:
     - Unique value propositions
     - Service/product differences
@@ -253,23 +554,27 @@ def analyze_competitors(main_url, competitor_urls: List[str]):
     If any websites couldn't be accessed, note this limitation and provide analysis based on available data.
     Respond in structured markdown format."""
 
-    main_site = Website(main_url)
+def analyze_competitors(main_url, competitor_urls: List[str]):
+    """Compare main website with competitors"""
+
+    # Scrape the sites side by side
+    with ThreadPoolExecutor(max_workers=COMPETITOR_FETCH_WORKERS) as executor:
+        main_site, *competitor_sites = executor.map(_get_website, [main_url, *competitor_urls])
     competitor_data = []
 
-    for comp_url in competitor_urls:
-        comp_site = Website(comp_url)
+    for comp_site in competitor_sites:
         competitor_data.append({
-            'url': comp_url,
+            'url': comp_site.url,
             'title': comp_site.title,
-            'content': comp_site.text[:2000] if comp_site.is_valid() else "Content not accessible",
+            'content': comp_site.text_short if comp_site.is_valid() else "Content not accessible",
             'accessible': comp_site.is_valid()
         })
 
     user_prompt = f"""Main Company Website:
     Title: {main_site.title}
-    URL: {main_url}
+    URL: {main_site.url}
     Accessible: {main_site.is_valid()}
-    Content: {main_site.text[:2000] if main_site.is_valid() else "Content not accessible"}
+    Content: {main_site.text_short if main_site.is_valid() else "Content not accessible"}
 
     Competitor Websites:
     """
@@ -279,18 +584,10 @@ def analyze_competitors(main_url, competitor_urls: List[str]):
         user_prompt += f"Accessible: {comp['accessible']}\n"
         user_prompt += f"Content: {comp['content']}"
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], COMPETITOR_SYSTEM_PROMPT)
 
 # =================== SEO ANALYSIS ===================
-def analyze_seo(url):
-    """Comprehensive SEO analysis of a website"""
-
-    website = Website(url)
-
-    if not website.is_valid():
-        return create_fallback_analysis(url, website.domain) + "\n\n## SEO Specific Recommendations:\n- Ensure website is crawlable by search engines\n- Check robots.txt file\n- Verify server response codes\n- Test website accessibility from different locations"
-
-    system_prompt = """You are an SEO expert. Analyze the website and provide recommendations on:
+SEO_SYSTEM_PROMPT = """You are an SEO expert. Analyze the website and provide recommendations on:
     - Title tag optimization
     - Meta description effectiveness
     - Content structure and headers
@@ -300,27 +597,33 @@ def analyze_seo(url):
     - Content quality and readability
     Provide actionable SEO recommendations in markdown format."""
 
+def analyze_seo(url):
+    """Comprehensive SEO analysis of a website"""
+
+    website = _get_website(url)
+
+    if not website.is_valid():
+        return create_fallback_analysis(url, website.domain) + "\n\n## SEO Specific Recommendations:\n- Ensure website is crawlable by search engines\n- Check robots.txt file\n- Verify server response codes\n- Test website accessibility from different locations"
+
     user_prompt = f"""Analyze this website for SEO:
     URL: {url}
     Title: {website.title}
     Meta Description: {website.meta_description}
     Keywords: {website.keywords}
-    Content Length: {len(website.text)} characters
+    Content Length: {website.text_length} characters
     Number of Images: {len(website.images)}
     Number of Links: {len(website.links)}
 
     Page Content:
-    {website.text[:3000]}"""
+    {website.text_med}"""
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], SEO_SYSTEM_PROMPT)
 
 # =================== CONTENT STRATEGY ===================
-def generate_content_ideas(url, content_type="blog"):
-    """Generate content marketing ideas based on website analysis"""
-
-    website = Website(url)
-
-    system_prompt = f"""You are a content marketing strategist. Based on the website analysis,
+@lru_cache(maxsize=64)
+def _content_system_prompt(content_type):
+    """System prompt for one content type (built once per type)"""
+    return f"""You are a content marketing strategist. Based on the website analysis,
     generate 10 {content_type} content ideas that would:
     - Attract the target audience
     - Showcase company expertise
@@ -337,6 +640,11 @@ def generate_content_ideas(url, content_type="blog"):
     If website content is limited, use the domain name and any available information to make educated assumptions about the business.
     Respond in structured markdown format."""
 
+def generate_content_ideas(url, content_type="blog"):
+    """Generate content marketing ideas based on website analysis"""
+
+    website = _get_website(url)
+
     user_prompt = f"""Generate {content_type} content ideas for this company:
     Company: {website.title}
     URL: {url}
@@ -344,17 +652,12 @@ def generate_content_ideas(url, content_type="blog"):
     Domain: {website.domain}
 
     Available Business Context:
-    {website.text[:2000] if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
+    {website.text_short if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], _content_system_prompt(content_type))
 
 # =================== LEAD GENERATION ===================
-def extract_contact_info(url):
-    """Extract and organize contact information from website"""
-
-    website = Website(url)
-
-    system_prompt = """You are a lead generation specialist. Extract and organize all contact information from the website including:
+LEADS_SYSTEM_PROMPT = """You are a lead generation specialist. Extract and organize all contact information from the website including:
     - Email addresses
     - Phone numbers
     - Physical addresses
@@ -371,27 +674,24 @@ def extract_contact_info(url):
     If website content is limited, note this limitation and provide general recommendations for lead generation.
     Respond in structured JSON format."""
 
+def extract_contact_info(url):
+    """Extract and organize contact information from website"""
+
+    website = _get_website(url)
+
     user_prompt = f"""Extract contact information and lead magnets from:
     URL: {url}
     Title: {website.title}
     Domain: {website.domain}
     Accessible: {website.is_valid()}
-    Content: {website.text[:2000] if website.is_valid() else "Limited access"}
+    Content: {website.text_short if website.is_valid() else "Limited access"}
 
-    Links found: {[link['text'] + ' -> ' + link['url'] for link in website.links[:20]]}"""
+    Links found: {[link.text + ' -> ' + link.url for link in website.links[:20]]}"""
 
-    return safe_ai_call([user_prompt], system_prompt, json_response=True)
+    return safe_ai_call([user_prompt], LEADS_SYSTEM_PROMPT, json_response=True)
 
 # =================== WEBSITE AUDIT ===================
-def comprehensive_audit(url):
-    """Perform a comprehensive website audit"""
-
-    website = Website(url)
-
-    if not website.is_valid():
-        return create_fallback_analysis(url, website.domain) + "\n\n## Audit Specific Recommendations:\n- Fix website accessibility issues\n- Ensure proper server configuration\n- Review security settings\n- Test from multiple locations and devices"
-
-    system_prompt = """You are a website auditor. Provide a comprehensive audit covering:
+AUDIT_SYSTEM_PROMPT = """You are a website auditor. Provide a comprehensive audit covering:
 
     **Technical Aspects:**
     - Page structure and navigation
@@ -416,29 +716,35 @@ def comprehensive_audit(url):
 
     Rate each section 1-10 and provide actionable recommendations."""
 
+def comprehensive_audit(url):
+    """Perform a comprehensive website audit"""
+
+    website = _get_website(url)
+
+    if not website.is_valid():
+        return create_fallback_analysis(url, website.domain) + "\n\n## Audit Specific Recommendations:\n- Fix website accessibility issues\n- Ensure proper server configuration\n- Review security settings\n- Test from multiple locations and devices"
+
     user_prompt = f"""Audit this website comprehensively:
     URL: {url}
     Title: {website.title}
     Meta Description: {website.meta_description}
-    Content Length: {len(website.text)} characters
-    Number of Pages Linked: {len([l for l in website.links if website.domain in l['url']])}
-    External Links: {len([l for l in website.links if website.domain not in l['url']])}
+    Content Length: {website.text_length} characters
+    Number of Pages Linked: {website.internal_link_count}
+    External Links: {website.external_link_count}
 
     Content:
-    {website.text[:4000]}
+    {website.text_long}
 
     Navigation/Links:
-    {[link['text'] for link in website.links[:15]]}"""
+    {[link.text for link in website.links[:15]]}"""
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], AUDIT_SYSTEM_PROMPT)
 
 # =================== SOCIAL MEDIA STRATEGY ===================
-def generate_social_media_strategy(url, platforms=["LinkedIn", "Twitter", "Instagram"]):
-    """Generate social media strategy based on website"""
-
-    website = Website(url)
-
-    system_prompt = f"""You are a social media strategist. Based on the website analysis, create a social media strategy for {', '.join(platforms)}:
+@lru_cache(maxsize=64)
+def _social_system_prompt(platforms):
+    """System prompt for a tuple of platforms (built once per combination)"""
+    return f"""You are a social media strategist. Based on the website analysis, create a social media strategy for {', '.join(platforms)}:
 
     For each platform, provide:
     - Content themes and topics
@@ -456,6 +762,11 @@ def generate_social_media_strategy(url, platforms=["LinkedIn", "Twitter", "Insta
     If website content is limited, use the domain name to infer business type and create appropriate strategies.
     Tailor recommendations to each platform's unique audience and features."""
 
+def generate_social_media_strategy(url, platforms=["LinkedIn", "Twitter", "Instagram"]):
+    """Generate social media strategy based on website"""
+
+    website = _get_website(url)
+
     user_prompt = f"""Create social media strategy for:
     Company: {website.title}
     URL: {url}
@@ -465,17 +776,15 @@ def generate_social_media_strategy(url, platforms=["LinkedIn", "Twitter", "Insta
     Target Platforms: {platforms}
 
     Available Business Context:
-    {website.text[:2000] if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
+    {website.text_short if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], _social_system_prompt(tuple(platforms)))
 
 # =================== EMAIL CAMPAIGN GENERATOR ===================
-def generate_email_campaigns(url, campaign_type="welcome_series"):
-    """Generate email marketing campaigns"""
-
-    website = Website(url)
-
-    system_prompt = f"""You are an email marketing specialist. Create a {campaign_type} email campaign based on the website analysis:
+@lru_cache(maxsize=64)
+def _email_system_prompt(campaign_type):
+    """System prompt for one campaign type (built once per type)"""
+    return f"""You are an email marketing specialist. Create a {campaign_type} email campaign based on the website analysis:
 
     Provide:
     - Email sequence outline (3-5 emails)
@@ -490,6 +799,11 @@ def generate_email_campaigns(url, campaign_type="welcome_series"):
     If website content is limited, use the domain name to infer business type and create appropriate campaigns.
     Make emails engaging, valuable, and aligned with the company's brand voice."""
 
+def generate_email_campaigns(url, campaign_type="welcome_series"):
+    """Generate email marketing campaigns"""
+
+    website = _get_website(url)
+
     user_prompt = f"""Create {campaign_type} email campaign for:
     Company: {website.title}
     URL: {url}
@@ -497,9 +811,9 @@ def generate_email_campaigns(url, campaign_type="welcome_series"):
     Business: {website.meta_description}
 
     Available Company Information:
-    {website.text[:2000] if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
+    {website.text_short if website.is_valid() else f"Limited access to {website.domain} - please infer business type from domain name"}"""
 
-    return safe_ai_call([user_prompt], system_prompt)
+    return safe_ai_call([user_prompt], _email_system_prompt(campaign_type))
 
 # =================== MAIN AGENTIC FUNCTION ===================
 def analyze_website_complete(url, analysis_type="all"):
@@ -521,17 +835,26 @@ def analyze_website_complete(url, analysis_type="all"):
     results = {}
 
     if analysis_type == "all":
-        for name, func in analyses.items():
-            print(f"\n📊 Running {name.upper()} analysis...")
-            print("-" * 40)
-            try:
-                results[name] = func()
-                print(f"✅ {name.upper()} analysis completed")
-                time.sleep(2)  # Rate limiting
-            except Exception as e:
-                error_msg = f"Error in {name} analysis: {str(e)}"
-                logger.error(error_msg)
-                results[name] = error_msg
+        # The analyses are independent and spend their time waiting on Gemini,
+        # so run them side by side; safe_ai_call() does the rate limiting
+        with ThreadPoolExecutor(max_workers=COMPLETE_ANALYSIS_WORKERS) as executor:
+            futures = {}
+            for name, func in analyses.items():
+                print(f"\n📊 Running {name.upper()} analysis...")
+                futures[executor.submit(func)] = name
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                    print(f"✅ {name.upper()} analysis completed")
+                except Exception as e:
+                    error_msg = f"Error in {name} analysis: {str(e)}"
+                    logger.error(error_msg)
+                    results[name] = error_msg
+
+        # Keep the usual section order rather than completion order
+        results = {name: results[name] for name in analyses}
     else:
         if analysis_type in analyses:
             print(f"\n📊 Running {analysis_type.upper()} analysis...")
@@ -551,19 +874,13 @@ def analyze_website_complete(url, analysis_type="all"):
 
 def create_brochure_from_url(url):
     """Helper function for brochure creation"""
-    website = Website(url)
+    website = _get_website(url)
     domain = website.domain
     company_name = domain.replace('www.', '').split('.')[0].title()
     return create_brochure(company_name, url)
 
 # Original brochure functions (preserved with error handling)
-def get_links(url):
-    website = Website(url)
-
-    if not website.is_valid():
-        return {"error": f"Could not access website: {website.error}"}
-
-    link_system_prompt = """You are provided with a list of links found on a webpage.
+LINK_SYSTEM_PROMPT = """You are provided with a list of links found on a webpage.
     You are able to decide which of the links would be most relevant to include in a brochure about the company,
     such as links to an About page, or a Company page, or Careers/Jobs pages.
     You should respond in JSON as in this example:
@@ -575,32 +892,38 @@ def get_links(url):
     }
     """
 
-    user_prompt = f"Here is the list of links on the website of {website.url} - "
-    user_prompt += "please decide which of these are relevant web links for a brochure about the company. "
-    user_prompt += "Links:\n" + "\n".join([link['url'] for link in website.links])
+def get_links(url):
+    website = _get_website(url)
 
-    return safe_ai_call([user_prompt], link_system_prompt, json_response=True)
+    if not website.is_valid():
+        return {"error": f"Could not access website: {website.error}"}
 
-def create_brochure(company_name, url, humorous=False):
-    """Create a company brochure based on website content"""
+    user_prompt = f"Here is the list of links on the website of {website.url} - "
+    user_prompt += "please decide which of these are relevant web links for a brochure about the company. "
+    user_prompt += "Links:\n" + "\n".join([link.url for link in website.links])
 
-    website = Website(url)
+    return safe_ai_call([user_prompt], LINK_SYSTEM_PROMPT, json_response=True)
 
-    system_prompt = """You are an assistant that analyzes the contents of several relevant pages from a company website
+BROCHURE_SYSTEM_PROMPT = """You are an assistant that analyzes the contents of several relevant pages from a company website
     and creates a short brochure about the company for prospective customers, investors and recruits. Respond in markdown.
     Include details of company culture, customers and careers/jobs if you have the information.
 
     If website content is limited, use the domain name and company name to create a professional brochure template."""
+HUMOROUS_BROCHURE_SYSTEM_PROMPT = BROCHURE_SYSTEM_PROMPT.replace("short brochure", "short humorous, entertaining, jokey brochure")
+
+def create_brochure(company_name, url, humorous=False):
+    """Create a company brochure based on website content"""
+
+    website = _get_website(url)
 
-    if humorous:
-        system_prompt = system_prompt.replace("short brochure", "short humorous, entertaining, jokey brochure")
+    system_prompt = HUMOROUS_BROCHURE_SYSTEM_PROMPT if humorous else BROCHURE_SYSTEM_PROMPT
 
     user_prompt = f"""Company: {company_name}
     URL: {url}
     Domain: {website.domain}
     Title: {website.title}
     Accessible: {website.is_valid()}
-    Content: {website.text[:3000] if website.is_valid() else f"Limited access to {website.domain} - please create a professional brochure template based on the company name and domain"}"""
+    Content: {website.text_med if website.is_valid() else f"Limited access to {website.domain} - please create a professional brochure template based on the company name and domain"}"""
 
     return safe_ai_call([user_prompt], system_prompt)
 